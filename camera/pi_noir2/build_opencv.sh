@@ -0,0 +1,130 @@
+#!/usr/bin/env bash
+# Rebuild OpenCV for the Raspberry Pi 5 (Cortex-A76) used by the NoIR tracker.
+#
+#   chmod +x camera/pi_noir2/build_opencv.sh
+#   PYTHON=~/noir-venv/bin/python ./camera/pi_noir2/build_opencv.sh
+#
+# The stock wheels target baseline armv8-a, so the fp16/dotprod NEON paths in the
+# imgproc kernels the tracker calls are never compiled in. This builds
+# opencv-python-headless from source for armv8.2-a with a profile-guided second pass
+# (PGO=0 skips it), trained on the tracker itself via test_accuracy.py's synthetic eyes,
+# and installs the wheel into $PYTHON. Create that venv with --system-site-packages
+# so the apt-installed picamera2 stays importable, and install the tracker's JIT
+# kernels' dependency into it (numba picks a release matching the venv's numpy):
+#
+#   python3 -m venv --system-site-packages ~/noir-venv
+#   ~/noir-venv/bin/python -m pip install "numba>=0.59"
+#
+# Expect about an hour per pass.
+
+set -euo pipefail
+
+PYTHON="${PYTHON:-python3}"
+OPENCV_PYTHON_REF="${OPENCV_PYTHON_REF:-88}"   # opencv-python tag, 88 = OpenCV 4.12.0
+BUILD_DIR="${BUILD_DIR:-${HOME}/opencv-build}"
+PGO="${PGO:-1}"
+TRACKER_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+if [[ "$(uname -m)" != "aarch64" ]]; then
+  echo "This build targets the Pi 5 (aarch64); refusing to run on $(uname -m)."
+  exit 1
+fi
+
+echo "Installing OS packages needed to build OpenCV..."
+
+sudo apt-get update
+sudo apt-get install -y \
+  build-essential \
+  cmake \
+  ninja-build \
+  git \
+  python3-dev
+
+ARCH_FLAGS="-O3 -march=armv8.2-a+dotprod+fp16 -mtune=cortex-a76"
+PROFILE_DIR="${BUILD_DIR}/profile"
+
+mkdir -p "$BUILD_DIR"
+cd "$BUILD_DIR"
+
+if [[ ! -d opencv-python ]]; then
+  git clone --recursive --depth 1 --branch "$OPENCV_PYTHON_REF" \
+    https://github.com/opencv/opencv-python.git
+fi
+
+"$PYTHON" -m pip install --upgrade pip wheel
+
+# $1: extra compiler flags for this pass
+build_wheel() {
+  rm -rf opencv-python/_skbuild dist
+  CMAKE_ARGS="-DCMAKE_BUILD_TYPE=Release \
+-DCMAKE_C_FLAGS='${ARCH_FLAGS} $1' \
+-DCMAKE_CXX_FLAGS='${ARCH_FLAGS} $1' \
+-DCPU_BASELINE=NEON;FP16;NEON_FP16;NEON_DOTPROD \
+-DCPU_DISPATCH= \
+-DWITH_OPENCL=OFF \
+-DBUILD_TESTS=OFF \
+-DBUILD_PERF_TESTS=OFF" \
+  ENABLE_HEADLESS=1 \
+  MAKEFLAGS="-j$(nproc)" \
+    "$PYTHON" -m pip wheel ./opencv-python --no-deps --verbose -w dist
+  "$PYTHON" -m pip install --force-reinstall --no-deps dist/opencv_python_headless-*.whl
+}
+
+# Runs the tracker itself (camera-free) so the profile is the real find_best_pupil mix:
+# lores frames, ROI tracking and full-frame rescans around blinks.
+run_workload() {
+  (cd "$TRACKER_DIR" && "$PYTHON" - <<'PY'
+import time
+
+import cv2
+from test_accuracy import BLINK_EVERY, RESOLUTION, synthetic_eye
+from video_processing import PupilTracker
+
+FRAMES = 300
+
+for detect_size in ((320, 240), RESOLUTION):
+    frames = [
+        cv2.resize(
+            synthetic_eye(200 + (i * 7) % 240, 160 + (i * 3) % 160, 20 + (i // 10) % 55,
+                          seed=i, blink=i % BLINK_EVERY >= BLINK_EVERY - 2),
+            detect_size, interpolation=cv2.INTER_AREA,
+        )
+        for i in range(FRAMES)
+    ]
+    tracker = PupilTracker(RESOLUTION, detect_size=detect_size)
+    scale = RESOLUTION[0] / detect_size[0]
+    tracker.find_best_pupil(frames[0], scale)  # JIT compile outside the timing
+    start = time.perf_counter()
+    for frame in frames:
+        tracker.frame_count += 1
+        tracker.find_best_pupil(frame, scale)
+    elapsed = (time.perf_counter() - start) / FRAMES * 1000
+    print(f"find_best_pupil {detect_size[0]}x{detect_size[1]}: {elapsed:.2f} ms/frame")
+
+frame = synthetic_eye(320, 240, 40)
+start = time.perf_counter()
+for _ in range(FRAMES):
+    cv2.medianBlur(frame, 3)
+elapsed = (time.perf_counter() - start) / FRAMES * 1000
+print(f"medianBlur 3x3 640x480: {elapsed:.3f} ms")
+PY
+  )
+}
+
+if [[ "$PGO" == "1" ]]; then
+  echo "PGO pass 1/2: instrumented build..."
+  rm -rf "$PROFILE_DIR"
+  build_wheel "-fprofile-generate=${PROFILE_DIR} -fprofile-update=atomic"
+  run_workload
+  echo "PGO pass 2/2: optimised build from profile..."
+  build_wheel "-fprofile-use=${PROFILE_DIR} -fprofile-partial-training -Wno-missing-profile"
+else
+  build_wheel ""
+fi
+
+"$PYTHON" -c "import cv2; print('opencv', cv2.__version__); print(cv2.getBuildInformation())" \
+  | grep -E "opencv|Baseline|Dispatched"
+run_workload
+
+echo ""
+echo "OpenCV rebuilt for Cortex-A76. Wheel kept in ${BUILD_DIR}/dist."
@@ -0,0 +1,127 @@
+# Offline accuracy check for NoIR - no camera needed, prints a per-run summary
+# Compares PupilTracker against the original single-pass pipeline on synthetic eyes
+import math
+import sys
+
+import cv2
+import numpy as np
+from video_processing import PupilTracker
+
+RESOLUTION = (640, 480)
+FRAMES = 200
+CENTRE_TOLERANCE = 1.0  # Max pupil centre error vs the reference (main-stream px)
+AREA_TOLERANCE = 0.10   # Max relative pupil area error vs the reference
+BLINK_EVERY = 40        # A two-frame blink every N frames forces full-frame rescans
+
+
+def synthetic_eye(cx, cy, radius, seed=0, blink=False, size=RESOLUTION):
+    """
+    NoIR-like eye: dark pupil on a mid-grey iris, a corneal glint, sensor noise and
+    salt-and-pepper speckle. A blink squashes the pupil to a slit.
+    Returns:
+        numpy.ndarray: uint8 (H, W) grey frame
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    img = np.full((h, w), 130, np.uint8)
+    cv2.ellipse(img, (cx + 5, cy), (2 * radius + 40, radius + 50), 0, 0, 360,
+                105, -1)
+    if blink:
+        cv2.ellipse(img, (cx, cy), (radius, 3), 0, 0, 360, 35, -1)
+    else:
+        cv2.circle(img, (cx, cy), radius, 35, -1)
+        cv2.circle(img, (cx + radius // 3, cy - radius // 4), 4, 230, -1)
+    img = np.clip(img + rng.normal(0, 8, img.shape), 0, 255).astype(np.uint8)
+    speckle = rng.integers(0, img.size, 300)
+    img.flat[speckle[:150]] = 0
+    img.flat[speckle[150:]] = 255
+    return img
+
+
+def reference_pupil(grey_frame):
+    """The original pipeline: stretch, 9x9 median, four threshold levels, fitEllipse"""
+    min_val, max_val, _, _ = cv2.minMaxLoc(grey_frame)
+    grey_frame = cv2.convertScaleAbs(grey_frame, alpha=255.0/(max_val - min_val + 1),
+                                     beta=-min_val)
+    blurred = cv2.medianBlur(grey_frame, 9)
+
+    best_candidate = None
+    highest_score = 0
+    for thresh in [25, 45, 65, 85]:
+        _, binary = cv2.threshold(blurred, thresh, 255, cv2.THRESH_BINARY_INV)
+        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if 40 < area < 27000:
+                perimeter = cv2.arcLength(contour, True)
+                if perimeter == 0:
+                    continue
+                circularity = (4 * math.pi * area) / (perimeter ** 2)
+                if circularity > 0.20:
+                    score = circularity * area
+                    if score > highest_score and len(contour) >= 5:
+                        highest_score = score
+                        best_candidate = contour
+                        candidate_area = area
+
+    if best_candidate is not None:
+        (cx, cy), (w, h), _ = cv2.fitEllipse(best_candidate)
+        if h < (w * 0.20) or candidate_area < 400:
+            return 1, 0.0, 0.0, 0.0
+        return 0, round(cx, 2), round(cy, 2), round(candidate_area, 2)
+
+    return 1, 0.0, 0.0, 0.0
+
+
+def test_accuracy(detect_size):
+    """
+    Drive one tracker over a drifting, resizing, blinking pupil and compare every
+    frame with reference_pupil() on the full-resolution frame.
+    Returns:
+        int: number of frames outside tolerance
+    """
+    tracker = PupilTracker(RESOLUTION, detect_size=detect_size)
+    scale = RESOLUTION[0] / detect_size[0]
+    failures = 0
+    worst_centre = worst_area = 0.0
+    for i in range(FRAMES):
+        cx = 200 + (i * 7) % 240
+        cy = 160 + (i * 3) % 160
+        radius = 20 + (i // 10) % 55  # 1250 - 17000 px², the recorded pupil range
+        blink = i % BLINK_EVERY >= BLINK_EVERY - 2
+        frame = synthetic_eye(cx, cy, radius, seed=i, blink=blink)
+
+        expected = reference_pupil(frame)
+        if detect_size != RESOLUTION:
+            # stands in for the ISP's lores downscale
+            frame = cv2.resize(frame, detect_size, interpolation=cv2.INTER_AREA)
+        tracker.frame_count += 1
+        got = tracker.find_best_pupil(frame, scale)
+
+        if got[0] != expected[0]:
+            failures += 1
+            print(f"F:{i:03d} blink mismatch: got {got}, expected {expected}")
+            continue
+        if got[0]:
+            continue
+        centre = math.hypot(got[1] - expected[1], got[2] - expected[2])
+        area = abs(got[3] - expected[3]) / expected[3]
+        worst_centre = max(worst_centre, centre)
+        worst_area = max(worst_area, area)
+        if centre > CENTRE_TOLERANCE or area > AREA_TOLERANCE:
+            failures += 1
+            print(f"F:{i:03d} off by {centre:.2f} px, {area:.1%} area: "
+                  f"got {got}, expected {expected}")
+
+    print(f"detect_size {detect_size}: {FRAMES - failures}/{FRAMES} within tolerance "
+          f"| worst centre {worst_centre:.2f} px | worst area {worst_area:.1%}")
+    return failures
+
+
+def main():
+    failures = test_accuracy(RESOLUTION) + test_accuracy((320, 240))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
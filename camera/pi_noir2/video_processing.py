@@ -3,126 +3,588 @@
 # Units: pixels for time, s or ns for time
 # All constant parameters can be tuned according to test results
 
-import cv2
-import time
+import asyncio
+import concurrent.futures
+import functools
 import math
-from picamera2 import Picamera2  # Raspberry pi camera module interface 
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+from numba import njit
+from picamera2 import MappedArray, Picamera2  # Raspberry pi camera module interface 
+
+# Dark-level thresholds for the multilevel cascade
+THRESHOLDS = np.array([25, 45, 65, 85], dtype=np.uint8)
+FOUR_PI = 4 * math.pi
+# Every possible 8-bit input, run through cv2 once per frame to build the stretch LUT
+GREY_LEVELS = np.arange(256, dtype=np.uint8).reshape(1, 256)
+
+
+def _level_cutoffs(lut, thresholds):
+    """
+    Quantize the threshold levels back into raw grey levels.
+    The stretch is monotonic, so stretched <= thresh <=> raw <= cutoff: the stretch is
+    applied to the 256-entry table once instead of to every pixel.
+    Returns:
+        numpy.ndarray: int16 cutoff per level (-1 = no grey level qualifies)
+    """
+    # min from the bright end: levels below the stretch minimum (where
+    # |x * alpha + beta| folds back up) count as darkest
+    monotonic = np.minimum.accumulate(lut[::-1])[::-1]
+    return np.searchsorted(monotonic, thresholds, side='right').astype(np.int16) - 1
+
+
+@njit(cache=True, nogil=True)
+def _multithresh(blurred, cutoffs, out):
+    """
+    Inverse binary threshold at every level in one pass over the frame.
+    Each row is read once and every level compares against that cache-resident row
+    in its own tight loop, which the compiler vectorizes.
+    Args:
+        blurred (numpy.ndarray): uint8 (H, W) frame
+        cutoffs (numpy.ndarray): int16 raw grey level cutoff per level
+        out (numpy.ndarray): uint8 (len(cutoffs), H, W) binary planes, written in place
+    """
+    h, w = blurred.shape
+    n = cutoffs.shape[0]
+    for y in range(h):
+        for k in range(n):
+            cutoff = cutoffs[k]
+            for x in range(w):
+                out[k, y, x] = 255 if blurred[y, x] <= cutoff else 0
+
+
+@njit(cache=True, nogil=True)
+def _best_contour(points, ends, area_min, area_max, circ_min):
+    """
+    Score every contour in one nopython loop and return the winner.
+    Area uses the shoelace formula and perimeter the sum of closed-polygon
+    segment lengths, matching cv2.contourArea / cv2.arcLength(closed=True).
+    Args:
+        points (numpy.ndarray): int32 (M, 2) points of all contours, back to back
+        ends (numpy.ndarray): end offset of each contour in points
+    Returns:
+        tuple: (index, area, score) - index is -1 if no contour qualifies
+    """
+    best_idx = -1
+    best_area = 0.0
+    highest_score = 0.0  # numerator (area^2) of the best score
+    best_perimeter_sq = 1.0  # its denominator
+    start = 0
+    for i in range(ends.shape[0]):
+        pts = points[start:ends[i]]
+        start = ends[i]
+        n = pts.shape[0]
+        # fewer than 5 corner points is a box, not a pupil outline
+        if n < 5:
+            continue
+
+        twice_area = 0.0
+        perimeter = 0.0
+        for j in range(n):
+            k = j + 1 if j + 1 < n else 0
+            x0, y0 = float(pts[j, 0]), float(pts[j, 1])
+            x1, y1 = float(pts[k, 0]), float(pts[k, 1])
+            twice_area += x0 * y1 - x1 * y0
+            perimeter += math.sqrt((x1 - x0) ** 2 + (y1 - y0) ** 2)
+        area = abs(twice_area) * 0.5
+
+        # Filter for realistic pupil sizes
+        if not (area_min < area < area_max) or perimeter == 0:
+            continue
+        # Circularity formula (roundness): 4 * pi * area / perimeter^2
+        # if circle, circularity = 1
+        # Cross-multiplied so the loop never divides
+        perimeter_sq = perimeter * perimeter
+        if FOUR_PI * area > circ_min * perimeter_sq:
+            # score = circularity * area ~ area^2 / perimeter^2, compared as fractions
+            if area * area * best_perimeter_sq > highest_score * perimeter_sq:
+                highest_score = area * area
+                best_perimeter_sq = perimeter_sq
+                best_idx = i
+                best_area = area
+    return best_idx, best_area, highest_score / best_perimeter_sq
+
 
 class PupilTracker:
     """
     Pupil Tracker optimized for Camera Module 2 NoIR lenses (<=1mm).
     Features contrast stretching to handle shallow depth-of-field issues.
+    Detection runs on a downscaled lores stream; results are reported in main-stream
+    pixels.
     """
 
-    def __init__(self, resolution=(640, 480), fps=50):
+    # Tunable detection parameters, in main-stream (full resolution) pixels
+    AREA_MIN        = 40            # Minimum contour area (px²)
+    AREA_MAX        = 27_000        # Maximum contour area (px²)
+    BLINK_AREA_MIN  = 400           # Smaller pupils are treated as a closing eye
+    CIRCULARITY_MIN = 0.20          # Rejects jagged eyelash blobs
+    ASPECT_MIN      = 0.20          # Flatter minor/major axis ratios count as a blink
+    ROI_MARGIN      = 32            # Pupil motion room per side beyond the widest pupil
+    # Side of the search square around the last pupil: fits the widest AREA_MAX pupil
+    ROI_SIZE        = int(2 * math.sqrt(AREA_MAX / math.pi)) + 2 * ROI_MARGIN
+    BOUNDS_REFRESH  = 30            # Frames between full-frame min/max re-measurements
+    BOUNDS_EMA      = 0.02          # Per-frame weight of the min/max measurements
+
+    DETECTORS = ('contours', 'blob')  # find_best_pupil backends
+
+    _camera = None           # Picamera2 kept open for the whole process
+    _camera_settings = None  # (resolution, detect_size, fps) it is configured for
+
+    def __init__(self, resolution=(640, 480), fps=50, detect_size=(320, 240),
+                 detector='contours', workers=1, umat=False):
+        if detector not in self.DETECTORS:
+            raise ValueError(
+                f"detector must be one of {self.DETECTORS}, got {detector!r}"
+            )
+        # One scale factor maps both axes (and areas) back to main-stream pixels
+        if resolution[0] * detect_size[1] != resolution[1] * detect_size[0]:
+            raise ValueError(
+                f"detect_size {detect_size} must have the aspect ratio of "
+                f"resolution {resolution}"
+            )
         self.resolution = resolution
         self.fps = fps
+        # Pupil localization tolerates 2x downsampling: 4x less memory traffic per pass
+        self.detect_size = detect_size
+        self._scale = resolution[0] / detect_size[0]  # main px per detection px
         self.picam2 = None  
+        self._stride = None  # bytes per lores Y-plane row, may exceed width
         self.session_id = None
         self.frame_count = 0
+        # Per-frame metrics as preallocated columns, indexed by frame_count - 1;
+        # grown by doubling
+        self._cap = 1024
+        self._cx = np.empty(self._cap, np.float32)
+        self._cy = np.empty(self._cap, np.float32)
+        self._area = np.empty(self._cap, np.float32)
+        self._blink = np.empty(self._cap, np.uint8)
+        self._binary_planes = None  # reused (levels, H, W) threshold output
+        # (x0, y0, x1, y1) search window in detection px; None = full frame
+        self.roi = None
+        # Smoothed full-frame contrast-stretch bounds; illumination changes slowly
+        self.min_ema = None
+        self.max_ema = None
+        self._bounds_frame = None  # frame_count at the last minMaxLoc
+        # 'contours': fused threshold cascade + JIT scoring
+        # 'blob': one native SimpleBlobDetector call
+        self.blob_detector = None
+        if detector == 'blob':
+            self.blob_detector = self._create_blob_detector()
+        # Threshold levels are independent and findContours releases the GIL, so they
+        # can be scored on worker threads; per-level work on a lores ROI is only tens
+        # of microseconds, so it stays serial unless workers > 1
+        self.workers = workers
+        self.pool = None  # created per session by init_session()
+        # frames() capture thread and its stop flag; end_session() stops it
+        self._capture_thread = None
+        self._capture_stop = None
+        # T-API: keep the blur cascade on an OpenCL device; without one (e.g. Raspberry
+        # Pi OS) UMat falls back to the CPU with extra per-call overhead, so it is
+        # never used there
+        self.umat = umat and cv2.ocl.haveOpenCL()
+
+    def _create_blob_detector(self):
+        """SimpleBlobDetector running the same multi-threshold + circularity search"""
+        area_scale = self._scale * self._scale
+        params = cv2.SimpleBlobDetector_Params()
+        params.minThreshold = 20
+        params.maxThreshold = 100
+        params.thresholdStep = 20
+        params.filterByColor = True
+        params.blobColor = 0  # dark pupil
+        params.filterByArea = True
+        params.minArea = 500 / area_scale
+        params.maxArea = 15_000 / area_scale
+        params.filterByCircularity = True
+        params.minCircularity = 0.4
+        # Flat blobs (closing eyelid) are dropped, so they read as a blink
+        params.filterByInertia = True
+        params.minInertiaRatio = self.ASPECT_MIN ** 2
+        return cv2.SimpleBlobDetector_create(params)
+
+    @classmethod
+    def _ensure_cam(cls, resolution, detect_size, fps):
+        """
+        Configured camera shared across sessions.
+        Opening and configuring allocates the DMA buffer pool, so it is only redone
+        when the stream settings change; sessions just start() and stop() it.
+        """
+        settings = (resolution, detect_size, fps)
+        if cls._camera is None:
+            cls._camera = Picamera2()
+        if cls._camera_settings != settings:
+            # YUV420: picamera2 native; Y-plane(luminance) is pure greyscale
+            # 2 buffers + queue=False: never serve a frame that completed while we were
+            # busy, so latency stays bounded at about one frame even if detection stalls
+            # the ISP scales to the lores stream for free, so no cv2.resize is needed
+            config = cls._camera.create_preview_configuration(
+                main={'format': 'YUV420', 'size': resolution},
+                lores={'format': 'YUV420', 'size': detect_size},
+                buffer_count=2,
+                queue=False,
+            )
+            config['main']['fps'] = fps
+            cls._camera.configure(config)
+            cls._camera_settings = settings
+        return cls._camera
 
     def init_camera(self):
         """Initialize camera"""
-        self.picam2 = Picamera2()
-        # YUV420: picamera2 native; Y-plane(luminance) is pure greyscale
-        config = self.picam2.create_preview_configuration(
-            main={'format': 'YUV420', 'size': self.resolution}
-        )
-        config['main']['fps'] = self.fps
-        self.picam2.configure(config)
+        self.picam2 = self._ensure_cam(self.resolution, self.detect_size, self.fps)
+        # stride is only known once libcamera has configured the stream
+        self._stride = self.picam2.stream_configuration('lores')['stride']
         self.picam2.start()
         return True
 
     def init_session(self):
         self.session_id = time.time_ns()
+        if self.workers > 1 and self.pool is None:
+            self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
 
-    def find_best_pupil(self, grey_frame):
+    def find_best_pupil(self, grey_frame, scale=1.0):
         """
-        1. Normalizes image contrast to handle 'muddy' NoIR sensor data.
-        2. Applies a heavy median blur to reduce sensor noise from the small aperture.
-        3. Iterates through multiple dark-level thresholds to find dark blobs.
+        1. Applies two cascaded 3x3 median passes to reduce sensor noise from the small
+           aperture.
+        2. Normalizes image contrast to handle 'muddy' NoIR sensor data.
+        3. Thresholds the stretched frame at multiple dark levels in one pass to find
+           dark blobs.
         4. Filters blobs based on area and circularity.
-        5. Performs blink detection based on the aspect ratio of the fitted ellipse.
+        5. Performs blink detection based on the aspect ratio from the blob's image
+           moments.
+        Only a ROI_SIZE square around the previous pupil is searched; a miss there, or a
+        pupil cut off by its edge (saccade or blink), is re-checked on the full frame.
         Args:
             grey_frame (numpy.ndarray)
+            scale (float): full-resolution pixels per grey_frame pixel
         Returns:
             tuple: (is_blink, cx, cy, area)
                 - is_blink (bool): True if no pupil is found or if the eye is closed.
                 - cx (float): The X-coordinate of the pupil center.
                 - cy (float): The Y-coordinate of the pupil center.
                 - area (float): The calculated area of the pupil contour.
+                All three are in full-resolution pixels.
         """
-        # Contrast stretch/ Normalization
-        # normalize narrow distributions
-        min_val, max_val, _, _ = cv2.minMaxLoc(grey_frame)
-        # output = (input + beta) * alpha
-        grey_frame = cv2.convertScaleAbs(grey_frame, alpha=255.0/(max_val - min_val + 1), beta=-min_val)
+        searched_roi = self.roi is not None
+        result = self._search(grey_frame, scale)
+        if result[0] and searched_roi:
+            # self.roi was cleared by the miss, so this is a full-frame scan
+            result = self._search(grey_frame, scale)
+        return result
+
+    def _search(self, grey_frame, scale):
+        """One detection pass over self.roi (or the full frame when it is None)"""
+        # Area limits shrink with the square of the downscale factor
+        area_scale = scale * scale
+
+        # Contrast stretch/ Normalization bounds always come from the full frame, so
+        # each threshold level maps to the same raw cutoff whether or not a ROI is
+        # searched
+        min_val, max_val = self._frame_bounds(grey_frame)
+
+        # Temporal locality: the pupil barely moves between frames at 50 FPS
+        frame_h, frame_w = grey_frame.shape
+        x0 = y0 = 0
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            grey_frame = grey_frame[y0:y1, x0:x1]
 
         # Blur to remove noise points using a sliding window
-        # center of kernel = median (not weighted average in convolution) to preserve sharp edges
-        blurred = cv2.medianBlur(grey_frame, 9) # kernel size n x n
-        
-        best_candidate = None
-        highest_score = 0
-        
+        # center of kernel = median (not weighted average in convolution) to preserve
+        # sharp edges
+        # the stretch below is monotonic, so blurring before it gives the same median
+        # two cascaded 3x3 passes: similar speckle rejection to one 9x9 window,
+        # but each pass is OpenCV's SIMD sort-network path instead of the slow
+        # large-kernel one
+        if self.umat:
+            # one upload, both passes on the device, one download for the threshold
+            # kernel
+            blurred = cv2.medianBlur(cv2.medianBlur(cv2.UMat(grey_frame), 3), 3).get()
+        else:
+            blurred = cv2.medianBlur(cv2.medianBlur(grey_frame, 3), 3)
+
+        # normalize narrow distributions
+        # 8-bit input has only 256 possible outputs: stretch the levels once, not every
+        # pixel; output = saturate(|input * alpha + beta|)
+        alpha = 255.0/(max_val - min_val + 1)
+        lut = cv2.convertScaleAbs(GREY_LEVELS, alpha=alpha, beta=-min_val)[0]
+
+        if self.blob_detector is not None:
+            return self._find_blob(blurred, lut, scale, (x0, y0), (frame_w, frame_h))
+
         # Multilevel Thresholding
         # for low constrast, poor lighting; brightness can fluctuate
         # singular thresholding may produce no contours
-        for thresh in [25, 45, 65, 85]:
-            _, binary = cv2.threshold(blurred, thresh, 255, cv2.THRESH_BINARY_INV)
-            # Approximate pupils with contours
-            contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                # Filter for realistic pupil sizes
-                if 40 < area < 27000:
-                    perimeter = cv2.arcLength(contour, True)
-                    if perimeter == 0: continue
-                    
-                    # Circularity formula (roundness)
-                    # if circle, circularity = 1 
-                    circularity = (4 * math.pi * area) / (perimeter ** 2)
-                    
-                    if circularity > 0.20: 
-                        score = circularity * area
-                        if score > highest_score and len(contour) >= 5:
-                            highest_score = score
-                            best_candidate = contour
-                            candidate_area = area
+        # the stretch is folded into the levels, then all of them share one pass over
+        # the frame
+        # sized for the full frame once; ROI frames write into its top-left corner
+        planes_shape = (len(THRESHOLDS), frame_h, frame_w)
+        if self._binary_planes is None or self._binary_planes.shape != planes_shape:
+            self._binary_planes = np.empty(planes_shape, dtype=np.uint8)
+        binary_planes = self._binary_planes[:, :blurred.shape[0], :blurred.shape[1]]
+        _multithresh(blurred, _level_cutoffs(lut, THRESHOLDS), binary_planes)
+
+        score_level = functools.partial(
+            self._score_level,
+            area_min=self.AREA_MIN / area_scale,
+            area_max=self.AREA_MAX / area_scale,
+        )
+        mapper = self.pool.map if self.pool is not None else map
+        levels = mapper(score_level, binary_planes)
+        # highest score wins; ties go to the darker level, as before
+        _, best_candidate, candidate_area = max(levels, key=lambda level: level[0])
+
+        # pupil runs off the ROI: its area and centre would be wrong, so rescan the
+        # full frame
+        if best_candidate is not None and self._clipped_by_roi(
+            cv2.boundingRect(best_candidate), blurred.shape, (frame_w, frame_h)
+        ):
+            best_candidate = None
 
         if best_candidate is not None:
-            # width and height of the smallest rectangle that can contain the ellipse
-            (cx, cy), (w, h), _ = cv2.fitEllipse(best_candidate)
+            # Image moments: centroid and second-order spread in one closed-form pass,
+            # instead of the iterative cv2.fitEllipse
+            moments = cv2.moments(best_candidate)
+            cx = moments['m10'] / moments['m00']
+            cy = moments['m01'] / moments['m00']
+            # minor/major axis ratio from the eigenvalues of the central moment matrix
+            mean = (moments['mu20'] + moments['mu02']) / 2
+            spread = math.hypot(
+                (moments['mu20'] - moments['mu02']) / 2, moments['mu11']
+            )
+            aspect = math.sqrt(max(mean - spread, 0.0) / (mean + spread))
             
             # Blink Detection: Aspect Ratio (flatness) + Area Floor
-            if h < (w * 0.20) or candidate_area < 400:
+            too_small = candidate_area < self.BLINK_AREA_MIN / area_scale
+            if aspect < self.ASPECT_MIN or too_small:
+                self.roi = None
                 return 1, 0.0, 0.0, 0.0
-                
-            return 0, round(cx, 2), round(cy, 2), round(candidate_area, 2)
 
+            return self._track(
+                cx, cy, candidate_area, scale, (x0, y0), (frame_w, frame_h)
+            )
+
+        self.roi = None
+        return 1, 0.0, 0.0, 0.0
+
+    def _frame_bounds(self, grey_frame):
+        """
+        Full-frame (min, max) for the stretch.
+        While tracking, re-measured every BOUNDS_REFRESH frames into an EMA weighted by
+        the frames elapsed since the last measurement. Once tracking is lost (full-frame
+        scan) it is re-measured every frame, so a lighting change during a blink cannot
+        hold back the recovery.
+        """
+        if self.roi is None:
+            self.min_ema, self.max_ema, _, _ = cv2.minMaxLoc(grey_frame)
+            self._bounds_frame = self.frame_count
+            return self.min_ema, self.max_ema
+
+        elapsed = self.frame_count - self._bounds_frame
+        if elapsed >= self.BOUNDS_REFRESH:
+            min_val, max_val, _, _ = cv2.minMaxLoc(grey_frame)
+            weight = 1 - (1 - self.BOUNDS_EMA) ** elapsed
+            self.min_ema += weight * (min_val - self.min_ema)
+            self.max_ema += weight * (max_val - self.max_ema)
+            self._bounds_frame = self.frame_count
+        return self.min_ema, self.max_ema
+
+    def _score_level(self, binary, area_min, area_max):
+        """Best contour of one threshold level: (score, contour, area), None if none"""
+        # Approximate pupils with contours
+        contours, _ = cv2.findContours(
+            binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+        if not contours:
+            return 0.0, None, 0.0
+        # Packed into one flat point array (single native copy) and scored in one JIT
+        # call, with no per-contour Python object to box
+        points = np.concatenate(contours).reshape(-1, 2)
+        ends = np.cumsum([len(contour) for contour in contours])
+        best_idx, area, score = _best_contour(
+            points, ends, area_min, area_max, self.CIRCULARITY_MIN
+        )
+        if best_idx < 0:
+            return 0.0, None, 0.0
+        return score, contours[best_idx], area
+
+    def _clipped_by_roi(self, rect, roi_shape, frame_size):
+        """True if a bounding box touches a ROI edge that is not also a frame edge"""
+        if self.roi is None:
+            return False
+        x0, y0, x1, y1 = self.roi
+        bx, by, bw, bh = rect
+        roi_h, roi_w = roi_shape
+        frame_w, frame_h = frame_size
+        return bool(
+            (bx <= 0 and x0 > 0) or (by <= 0 and y0 > 0)
+            or (bx + bw >= roi_w and x1 < frame_w)
+            or (by + bh >= roi_h and y1 < frame_h)
+        )
+
+    def _find_blob(self, blurred, lut, scale, offset, frame_size):
+        """'blob' backend of find_best_pupil: the detector does its own thresholding"""
+        stretched = cv2.LUT(blurred, lut)
+        keypoints = self.blob_detector.detect(stretched)
+        if keypoints:
+            best = max(keypoints, key=lambda k: k.size)
+            area = math.pi * (best.size / 2) ** 2
+            r = best.size / 2
+            rect = (best.pt[0] - r, best.pt[1] - r, best.size, best.size)
+            clipped = self._clipped_by_roi(rect, blurred.shape, frame_size)
+            if area >= self.BLINK_AREA_MIN / (scale * scale) and not clipped:
+                return self._track(
+                    best.pt[0], best.pt[1], area, scale, offset, frame_size
+                )
+
+        self.roi = None
         return 1, 0.0, 0.0, 0.0
 
+    def _track(self, cx, cy, area, scale, offset, frame_size):
+        """Re-centre the ROI on a detection and report it in full-resolution pixels"""
+        # Back to full-frame detection coordinates
+        cx, cy = cx + offset[0], cy + offset[1]
+        frame_w, frame_h = frame_size
+        half = int(self.ROI_SIZE / scale) // 2
+        self.roi = (
+            max(0, int(cx) - half), max(0, int(cy) - half),
+            min(frame_w, int(cx) + half), min(frame_h, int(cy) + half),
+        )
+        # a detection pixel covers scale main pixels: its centre sits (scale - 1) / 2 in
+        full_cx = cx * scale + (scale - 1) / 2
+        full_cy = cy * scale + (scale - 1) / 2
+        return 0, round(full_cx, 2), round(full_cy, 2), round(area * scale * scale, 2)
+
     def process_frame(self):
         if self.picam2 is None:
             return None
         
-        frame_data = self.picam2.capture_array()
-        self.frame_count += 1
-        
-        if frame_data is None:
-            return None
-            
-        # Extract Y-plane (Grayscale)
-        grey_frame = frame_data if len(frame_data.shape) == 2 else frame_data[:, :, 0]
-        
-        blink, cx, cy, area = self.find_best_pupil(grey_frame)
+        # Map the dmabuf in place instead of capture_array(), which copies the whole
+        # YUV420 frame
+        with self.picam2.captured_request() as request:
+            with MappedArray(request, 'lores', reshape=False, write=False) as mapped:
+                self.frame_count += 1
+                # OpenCV's SIMD kernels want unpadded rows; this only copies if
+                # stride != width
+                grey_frame = np.ascontiguousarray(self._grey_view(mapped))
+                # Must finish before the buffer is handed back to the camera
+                blink, cx, cy, area = self.find_best_pupil(grey_frame, self._scale)
+
+        return self._record(blink, cx, cy, area)
+
+    def _record(self, blink, cx, cy, area):
+        """Store this frame's metrics in the session columns and return the tuple"""
+        i = self.frame_count - 1
+        if i >= self._cap:
+            self._cap *= 2
+            self._cx = np.resize(self._cx, self._cap)
+            self._cy = np.resize(self._cy, self._cap)
+            self._area = np.resize(self._area, self._cap)
+            self._blink = np.resize(self._blink, self._cap)
+        self._blink[i] = blink
+        self._cx[i] = cx
+        self._cy[i] = cy
+        self._area[i] = area
         return (self.frame_count, float(blink), float(cx), float(cy), float(area))
 
+    def _grey_view(self, mapped):
+        """View the Y-plane of a mapped lores YUV420 buffer without copying"""
+        w, h = self.detect_size
+        # YUV420 is planar: the Y-plane (grayscale) is the first stride x height bytes
+        return mapped.array[:h * self._stride].reshape(h, self._stride)[:, :w]
+
+    def _capture_loop(self, camera, frames, stop):
+        """Capture thread: blocks on the sensor and feeds Y-planes into the queue"""
+        while not stop.is_set():
+            with camera.captured_request() as request:
+                with MappedArray(
+                    request, 'lores', reshape=False, write=False
+                ) as mapped:
+                    # Copy only the Y-plane so the request goes straight back to the
+                    # camera; the copy is C-contiguous even when the rows are padded
+                    grey_frame = self._grey_view(mapped).copy()
+            # Latest-only: replace the waiting frame rather than queue behind it
+            while True:
+                try:
+                    frames.put_nowait(grey_frame)
+                    break
+                except queue.Full:
+                    try:
+                        frames.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    async def frames(self):
+        """
+        Stream per-frame metrics with capture and pupil detection overlapped.
+        A capture thread keeps the sensor at its native FPS while detection runs in the
+        default executor; the queue holds a single frame that each capture replaces,
+        so detection always gets the newest frame and latency cannot grow behind a
+        slow one.
+        Yields:
+            tuple: same as process_frame()
+        """
+        if self.picam2 is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        # One slot: a second would hand detection the older of two frames after a stall
+        frames = queue.Queue(maxsize=1)
+        self._capture_stop = threading.Event()
+        capture = self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            args=(self.picam2, frames, self._capture_stop),
+            daemon=True,
+        )
+        capture.start()
+        try:
+            while True:
+                try:
+                    # timeout so no executor thread is left blocked after shutdown
+                    grey_frame = await loop.run_in_executor(None, frames.get, True, 1.0)
+                except queue.Empty:
+                    if not capture.is_alive():
+                        return
+                    continue
+                self.frame_count += 1
+                blink, cx, cy, area = await loop.run_in_executor(
+                    None, self.find_best_pupil, grey_frame, self._scale
+                )
+                yield self._record(blink, cx, cy, area)
+        finally:
+            # a generator closed after end_session() must not stop a later session's
+            if self._capture_thread is capture:
+                self._stop_capture()
+
+    def _stop_capture(self):
+        """Stop the frames() capture thread, if any, before the camera is stopped"""
+        if self._capture_thread is None:
+            return
+        capture = self._capture_thread
+        self._capture_stop.set()
+        self._capture_thread = self._capture_stop = None
+        # it exits after at most the one capture it is blocked in
+        capture.join(timeout=1.0)
+        if capture.is_alive():
+            raise RuntimeError("NoIR capture thread did not stop within 1 s")
+
     def end_session(self):
-        if self.picam2 is not None:
-            self.picam2.stop()
-            self.picam2 = None
+        # the capture thread must be gone before stop(): a stopped (and shared) camera
+        # would otherwise hand it the next session's first frame
+        try:
+            self._stop_capture()
+        finally:
+            if self.picam2 is not None:
+                # stop streaming only; the configured camera stays cached for the next
+                # session
+                self.picam2.stop()
+                self.picam2 = None
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
     
     def __enter__(self):
         self.init_camera()
@@ -50,6 +50,7 @@ uv run python - <<'PY'
 # requires-python = ">=3.11"
 # dependencies = [
 #     "numpy>=1.26",
+#     "numba>=0.59",
 #     "opencv-python-headless>=4.8",
 #     "scikit-learn>=1.4",
 #     "joblib>=1.3",
@@ -57,11 +58,13 @@ uv run python - <<'PY'
 # ///
 import cv2
 import joblib
+import numba
 import numpy
 import sklearn
 
 print("opencv", cv2.__version__)
 print("numpy", numpy.__version__)
+print("numba", numba.__version__)
 print("sklearn", sklearn.__version__)
 PY
 